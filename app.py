@@ -1,10 +1,13 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import re
 
+ITEM_ID_RE = re.compile(r'/itm/(\d+)')
+
 st.set_page_config(page_title="eBay Sales Analytics Dashboard", layout="wide", initial_sidebar_state="expanded")
 
 st.markdown("""
@@ -20,22 +23,71 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+def derive_sales_metrics(dec, jan, price):
+    total = dec + jan
+    growth = jan - dec
+    growth_pct = np.zeros(dec.shape[0], dtype=np.float64)
+    np.divide(growth, dec, out=growth_pct, where=dec > 0)
+    growth_pct *= 100.0
+    growth_pct[(dec <= 0) & (jan > 0)] = 100.0
+    dec_rev = dec * price
+    jan_rev = jan * price
+    return total, growth, growth_pct, dec_rev, jan_rev, dec_rev + jan_rev, jan_rev - dec_rev
+
+try:
+    import numba
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _derive_sales_metrics_jit(dec, jan, price):
+        n = dec.shape[0]
+        total = np.empty(n, np.int64)
+        growth = np.empty(n, np.int64)
+        growth_pct = np.empty(n, np.float64)
+        dec_rev = np.empty(n, np.float64)
+        jan_rev = np.empty(n, np.float64)
+        total_rev = np.empty(n, np.float64)
+        rev_growth = np.empty(n, np.float64)
+        for i in numba.prange(n):
+            d = dec[i]
+            j = jan[i]
+            p = price[i]
+            total[i] = d + j
+            growth[i] = j - d
+            growth_pct[i] = (j - d) / d * 100.0 if d > 0 else (100.0 if j > 0 else 0.0)
+            dec_rev[i] = d * p
+            jan_rev[i] = j * p
+            total_rev[i] = dec_rev[i] + jan_rev[i]
+            rev_growth[i] = jan_rev[i] - dec_rev[i]
+        return total, growth, growth_pct, dec_rev, jan_rev, total_rev, rev_growth
+
+    def derive_sales_metrics(dec, jan, price):
+        return _derive_sales_metrics_jit(np.asarray(dec, np.int64), np.asarray(jan, np.int64), np.asarray(price, np.float64))
+except ImportError:
+    pass
+
 @st.cache_data(show_spinner="Parsing CSV data...", max_entries=1)
-def parse_sales_data(file_content):
+def parse_sales_data(file_bytes):
     import io
     try:
-        df = pd.read_csv(io.StringIO(file_content), header=None, on_bad_lines='skip', engine='c', low_memory=False)
-        
-        if df.iloc[0, 0] and isinstance(df.iloc[0, 0], str) and 'keyword' in df.iloc[0, 0].lower():
-            df = df.iloc[1:]
-        
-        df = df.reset_index(drop=True)
+        # Detect the keyword header line up front so the readers can skip
+        # it natively instead of slicing and re-indexing after the parse.
+        first_line = file_bytes[:1024].split(b'\n', 1)[0]
+        skip_rows = 1 if b'keyword' in first_line.lower() else 0
+        try:
+            import pyarrow.csv as pacsv
+            table = pacsv.read_csv(io.BytesIO(file_bytes),
+                                   read_options=pacsv.ReadOptions(autogenerate_column_names=True, skip_rows=skip_rows),
+                                   convert_options=pacsv.ConvertOptions(strings_can_be_null=True))
+            df = table.to_pandas()
+        except Exception:
+            df = pd.read_csv(io.BytesIO(file_bytes), header=None, skiprows=skip_rows, on_bad_lines='skip', engine='c', low_memory=False)
+
         num_cols = len(df.columns)
         format_type = 'old'
         
-        if num_cols >= 7:
-            sample_val = str(df.iloc[0, 2]) if len(df) > 0 else ''
-            if '$' in sample_val or (sample_val.replace('.', '').replace(',', '').isdigit() and '.' in sample_val):
+        if num_cols >= 7 and len(df) > 0:
+            sample = df.iloc[:10, 2].astype(str)
+            if sample.str.startswith('$').any() or sample.str.fullmatch(r'[\d,]+\.\d+').any():
                 format_type = 'new'
         
         if format_type == 'new' and num_cols >= 7:
@@ -50,35 +102,49 @@ def parse_sales_data(file_content):
         else:
             st.error(f"CSV file has insufficient columns ({num_cols}). Expected at least 5 columns.")
             return pd.DataFrame()
-        
-        df['Dec 2025 Sales'] = pd.to_numeric(df['Dec 2025 Sales'], errors='coerce').fillna(0).astype(int)
-        df['Jan 2026 Sales'] = pd.to_numeric(df['Jan 2026 Sales'], errors='coerce').fillna(0).astype(int)
+
+        df = df.drop(columns=[c for c in df.columns if c.startswith('Extra_')])
+
+        df['Dec 2025 Sales'] = pd.to_numeric(df['Dec 2025 Sales'], errors='coerce').fillna(0).astype(np.int32)
+        df['Jan 2026 Sales'] = pd.to_numeric(df['Jan 2026 Sales'], errors='coerce').fillna(0).astype(np.int32)
         
         if 'Price' in df.columns:
-            df['Price'] = df['Price'].astype(str).str.replace('$', '').str.replace(',', '').str.strip()
+            df['Price'] = df['Price'].astype(str).str.replace(r'[\$,\s]', '', regex=True)
             df['Price'] = pd.to_numeric(df['Price'], errors='coerce').fillna(0).astype(float)
         
-        df['Date Checked'] = pd.to_datetime(df['Date Checked'], errors='coerce')
-        df['Total Sales'] = df['Dec 2025 Sales'] + df['Jan 2026 Sales']
-        df['Growth'] = df['Jan 2026 Sales'] - df['Dec 2025 Sales']
-        
-        df['Growth %'] = 0.0
-        mask_has_dec = df['Dec 2025 Sales'] > 0
-        df.loc[mask_has_dec, 'Growth %'] = ((df.loc[mask_has_dec, 'Jan 2026 Sales'] - df.loc[mask_has_dec, 'Dec 2025 Sales']) / df.loc[mask_has_dec, 'Dec 2025 Sales'] * 100)
-        df.loc[~mask_has_dec & (df['Jan 2026 Sales'] > 0), 'Growth %'] = 100
-        
-        df['Dec Revenue'] = df['Dec 2025 Sales'] * df['Price']
-        df['Jan Revenue'] = df['Jan 2026 Sales'] * df['Price']
-        df['Total Revenue'] = df['Total Sales'] * df['Price']
-        df['Revenue Growth'] = df['Jan Revenue'] - df['Dec Revenue']
-        df['Item ID'] = df['URL'].str.extract(r'/itm/(\d+)', expand=False).fillna('N/A')
-        
-        df['Product'] = df['Product'].astype(str).str.strip()
-        df['URL'] = df['URL'].astype(str).str.strip()
-        df['Status'] = df['Status'].astype(str)
-        df = df[df['URL'].str.contains('ebay.com', na=False)]
+        # The scraper emits fixed-width timestamps; an explicit format keeps
+        # to_datetime on the C fast path. Re-sniff only if that barely matches.
+        dates = pd.to_datetime(df['Date Checked'], errors='coerce', format='%Y-%m-%d %H:%M:%S')
+        if len(dates) and dates.isna().mean() > 0.05:
+            dates = pd.to_datetime(df['Date Checked'], errors='coerce')
+        df['Date Checked'] = dates
+
+        dec = df['Dec 2025 Sales'].to_numpy()
+        jan = df['Jan 2026 Sales'].to_numpy()
+        price = df['Price'].to_numpy(dtype=np.float64)
+        total, growth, growth_pct, dec_rev, jan_rev, total_rev, rev_growth = derive_sales_metrics(dec, jan, price)
+        metrics = pd.DataFrame({'Total Sales': total, 'Growth': growth, 'Growth %': growth_pct,
+                                'Dec Revenue': dec_rev, 'Jan Revenue': jan_rev,
+                                'Total Revenue': total_rev, 'Revenue Growth': rev_growth}, index=df.index)
+        df = pd.concat([df, metrics], axis=1)
+        df['Item ID'] = df['URL'].str.extract(ITEM_ID_RE, expand=False).fillna('N/A')
         
-        return df[['Product', 'URL', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Price', 'Total Sales', 'Growth', 'Growth %', 
+        df[['Product', 'URL']] = df[['Product', 'URL']].astype('string[pyarrow]')
+        df['Product'] = df['Product'].str.strip().fillna('N/A')
+        df['URL'] = df['URL'].str.strip()
+        df['Status'] = df['Status'].astype(str).astype('category')
+        df = df[df['URL'].str.contains('ebay.com', na=False, regex=False)]
+        df['Product'] = df['Product'].astype('category')
+        df = df.sort_values('Total Sales', ascending=False).reset_index(drop=True)
+
+        # Display-precision floats and int32 counts halve the bytes every
+        # downstream filter/aggregation pulls through the cache hierarchy.
+        df = df.astype({'Total Sales': np.int32, 'Growth': np.int32,
+                        'Price': np.float32, 'Growth %': np.float32,
+                        'Dec Revenue': np.float32, 'Jan Revenue': np.float32,
+                        'Total Revenue': np.float32, 'Revenue Growth': np.float32}, copy=False)
+
+        return df[['Product', 'URL', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Price', 'Total Sales', 'Growth', 'Growth %',
                    'Dec Revenue', 'Jan Revenue', 'Total Revenue', 'Revenue Growth', 'Date Checked', 'Status', 'Item ID']]
     except Exception as e:
         st.error(f"Error parsing CSV: {str(e)}")
@@ -86,40 +152,81 @@ def parse_sales_data(file_content):
 
 @st.cache_data(show_spinner=False, max_entries=10)
 def apply_filters(df, time_minutes, selected_product, performance_filter, min_total_sales, min_jan_sales):
-    filtered_df = df.copy()
-    
+    mask = np.ones(len(df), dtype=bool)
+
     if time_minutes is not None:
         cutoff_time = datetime.now() - timedelta(minutes=time_minutes)
-        filtered_df = filtered_df[filtered_df['Date Checked'] >= cutoff_time]
-    
+        mask &= (df['Date Checked'] >= cutoff_time).to_numpy()
+
     if selected_product != 'All Products':
-        filtered_df = filtered_df[filtered_df['Product'] == selected_product]
-    
+        mask &= (df['Product'] == selected_product).to_numpy()
+
     if performance_filter == "Growing (Jan > Dec)":
-        filtered_df = filtered_df[filtered_df['Growth'] > 0]
+        mask &= df['Growth'].to_numpy() > 0
     elif performance_filter == "Declining (Jan < Dec)":
-        filtered_df = filtered_df[filtered_df['Growth'] < 0]
+        mask &= df['Growth'].to_numpy() < 0
     elif performance_filter == "No Sales":
-        filtered_df = filtered_df[filtered_df['Total Sales'] == 0]
+        mask &= df['Total Sales'].to_numpy() == 0
     elif performance_filter == "New Sales (Dec=0, Jan>0)":
-        filtered_df = filtered_df[(filtered_df['Dec 2025 Sales'] == 0) & (filtered_df['Jan 2026 Sales'] > 0)]
-    
-    filtered_df = filtered_df[filtered_df['Total Sales'] >= min_total_sales]
-    filtered_df = filtered_df[filtered_df['Jan 2026 Sales'] >= min_jan_sales]
-    return filtered_df
+        mask &= (df['Dec 2025 Sales'].to_numpy() == 0) & (df['Jan 2026 Sales'].to_numpy() > 0)
+
+    mask &= df['Total Sales'].to_numpy() >= min_total_sales
+    mask &= df['Jan 2026 Sales'].to_numpy() >= min_jan_sales
+    return df.loc[mask]
 
 @st.cache_data(show_spinner=False, max_entries=10)
 def calculate_category_stats(filtered_df):
-    category_stats = filtered_df.groupby('Product').agg({
-        'Total Sales': 'sum', 'Dec 2025 Sales': 'sum', 'Jan 2026 Sales': 'sum',
-        'Total Revenue': 'sum', 'Dec Revenue': 'sum', 'Jan Revenue': 'sum',
-        'Price': 'mean', 'URL': 'count'
+    category_stats = filtered_df.groupby('Product', observed=True, sort=False).agg(**{
+        'Total Sales': ('Total Sales', 'sum'), 'Dec Sales': ('Dec 2025 Sales', 'sum'), 'Jan Sales': ('Jan 2026 Sales', 'sum'),
+        'Total Revenue': ('Total Revenue', 'sum'), 'Dec Revenue': ('Dec Revenue', 'sum'), 'Jan Revenue': ('Jan Revenue', 'sum'),
+        'Avg Price': ('Price', 'mean'), 'Listings Count': ('URL', 'size')
     }).reset_index()
-    category_stats.columns = ['Product', 'Total Sales', 'Dec Sales', 'Jan Sales', 'Total Revenue', 'Dec Revenue', 'Jan Revenue', 'Avg Price', 'Listings Count']
     category_stats['Avg Sales per Listing'] = (category_stats['Total Sales'] / category_stats['Listings Count']).round(1)
     category_stats['Avg Revenue per Listing'] = (category_stats['Total Revenue'] / category_stats['Listings Count']).round(2)
     return category_stats.sort_values('Total Sales', ascending=False)
 
+@st.cache_data(show_spinner=False, max_entries=10)
+def build_category_charts(category_stats):
+    fig_pie = px.pie(category_stats.head(10), values='Total Sales', names='Product', title='Sales Distribution (Top 10 Categories)')
+    fig_bar = px.bar(category_stats.head(15), x='Product', y='Listings Count', title='Number of Listings per Category (Top 15)', color='Total Sales', color_continuous_scale='Viridis')
+    fig_bar.update_layout(xaxis_tickangle=-45)
+    return fig_pie.to_dict(), fig_bar.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=10)
+def calculate_growth_distribution(filtered_df):
+    bin_idx = np.digitize(filtered_df['Growth %'].to_numpy(), [-50, -10, 0, 10, 50], right=True)
+    return np.bincount(bin_idx, minlength=6)
+
+@st.cache_data(show_spinner=False, max_entries=10)
+def dataframe_to_csv_bytes(df):
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pacsv
+        buf = pa.BufferOutputStream()
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+        return buf.getvalue().to_pybytes()
+    except Exception:
+        return df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def sidebar_metadata(df):
+    return {'products': ['All Products'] + df['Product'].cat.categories.sort_values().tolist(),
+            'max_total': int(df['Total Sales'].max()),
+            'max_jan': int(df['Jan 2026 Sales'].max())}
+
+def top_n_rows(df, column, n, ascending=False):
+    values = df[column].to_numpy()
+    n = min(n, len(values))
+    if n == 0 or n == len(values):
+        return df.sort_values(column, ascending=ascending)
+    if ascending:
+        idx = np.argpartition(values, n - 1)[:n]
+        idx = idx[np.argsort(values[idx])]
+    else:
+        idx = np.argpartition(values, len(values) - n)[-n:]
+        idx = idx[np.argsort(-values[idx])]
+    return df.iloc[idx]
+
 st.title("📊 eBay Sales Analytics Dashboard")
 st.markdown("*Track and analyze product performance across December 2025 & January 2026*")
 st.markdown("---")
@@ -127,10 +234,8 @@ st.markdown("---")
 uploaded_file = st.file_uploader("📁 Upload your sales data (CSV/TXT)", type=['csv', 'txt'])
 
 if uploaded_file is not None:
-    content = uploaded_file.getvalue().decode('utf-8')
-    
     with st.spinner("Loading data..."):
-        df = parse_sales_data(content)
+        df = parse_sales_data(uploaded_file.getvalue())
     
     if df.empty:
         st.error("No valid data found in the uploaded file.")
@@ -145,13 +250,13 @@ if uploaded_file is not None:
         }
         
         selected_time_filter = st.sidebar.selectbox("Show items added within:", list(time_filter_options.keys()), index=0)
-        products = ['All Products'] + sorted(df['Product'].unique().tolist())
-        selected_product = st.sidebar.selectbox("Filter by Product", products)
+        df_meta = sidebar_metadata(df)
+        selected_product = st.sidebar.selectbox("Filter by Product", df_meta['products'])
         performance_filter = st.sidebar.selectbox("Performance Type", ["All", "Growing (Jan > Dec)", "Declining (Jan < Dec)", "No Sales", "New Sales (Dec=0, Jan>0)"])
         
         st.sidebar.markdown("### Sales Range")
-        min_total_sales = st.sidebar.number_input("Min Total Sales", 0, int(df['Total Sales'].max()), 0)
-        min_jan_sales = st.sidebar.number_input("Min Jan Sales", 0, int(df['Jan 2026 Sales'].max()), 0)
+        min_total_sales = st.sidebar.number_input("Min Total Sales", 0, df_meta['max_total'], 0)
+        min_jan_sales = st.sidebar.number_input("Min Jan Sales", 0, df_meta['max_jan'], 0)
         
         filtered_df = apply_filters(df, time_filter_options[selected_time_filter], selected_product, performance_filter, min_total_sales, min_jan_sales)
         
@@ -163,8 +268,8 @@ if uploaded_file is not None:
             st.info(f"🕐 Showing data for: **{selected_time_filter}**")
         
         col1, col2, col3, col4, col5 = st.columns(5)
-        total_dec = filtered_df['Dec 2025 Sales'].sum()
-        total_jan = filtered_df['Jan 2026 Sales'].sum()
+        total_dec = filtered_df['Dec 2025 Sales'].to_numpy().sum()
+        total_jan = filtered_df['Jan 2026 Sales'].to_numpy().sum()
         growth_pct = ((total_jan - total_dec) / total_dec * 100) if total_dec > 0 else 0
         
         with col1:
@@ -174,25 +279,25 @@ if uploaded_file is not None:
         with col3:
             st.metric("Jan 2026 Sales", f"{total_jan:,}", f"{growth_pct:+.1f}%")
         with col4:
-            st.metric("Total Sales", f"{filtered_df['Total Sales'].sum():,}")
+            st.metric("Total Sales", f"{filtered_df['Total Sales'].to_numpy().sum():,}")
         with col5:
-            st.metric("Avg Growth", f"{filtered_df['Growth %'].mean():+.1f}%")
+            st.metric("Avg Growth", f"{filtered_df['Growth %'].to_numpy().mean():+.1f}%")
         
         col1, col2, col3, col4, col5 = st.columns(5)
-        total_jan_rev = filtered_df['Jan Revenue'].sum()
-        total_dec_rev = filtered_df['Dec Revenue'].sum()
+        total_jan_rev = filtered_df['Jan Revenue'].to_numpy().sum()
+        total_dec_rev = filtered_df['Dec Revenue'].to_numpy().sum()
         rev_growth = ((total_jan_rev - total_dec_rev) / total_dec_rev * 100) if total_dec_rev > 0 else 0
         
         with col1:
-            st.metric("Avg Price", f"${filtered_df['Price'].mean():.2f}")
+            st.metric("Avg Price", f"${filtered_df['Price'].to_numpy().mean():.2f}")
         with col2:
             st.metric("Dec Revenue", f"${total_dec_rev:,.2f}")
         with col3:
             st.metric("Jan Revenue", f"${total_jan_rev:,.2f}", f"{rev_growth:+.1f}%")
         with col4:
-            st.metric("Total Revenue", f"${filtered_df['Total Revenue'].sum():,.2f}")
+            st.metric("Total Revenue", f"${filtered_df['Total Revenue'].to_numpy().sum():,.2f}")
         with col5:
-            st.metric("Revenue Growth", f"${filtered_df['Revenue Growth'].sum():+,.2f}")
+            st.metric("Revenue Growth", f"${filtered_df['Revenue Growth'].to_numpy().sum():+,.2f}")
         
         st.markdown("---")
         
@@ -201,20 +306,26 @@ if uploaded_file is not None:
         with tab1:
             st.markdown("### 🏆 Top Performers")
             top_n = st.selectbox("Show Top:", [10, 20, 30, 40, 50, 100], index=0, key="top_n_selector")
+            # Title-case once per unique category instead of per card row.
+            product_categories = filtered_df['Product'].cat.categories
+            title_map = dict(zip(product_categories, product_categories.str.title()))
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown(f"### 🥇 Top {top_n} by Total Sales")
-                top_sales = filtered_df.nlargest(top_n, 'Total Sales')[['Product', 'Item ID', 'Total Sales', 'Price', 'Total Revenue', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Date Checked']]
+                top_sales = filtered_df.head(top_n)[['Product', 'Item ID', 'Total Sales', 'Price', 'Total Revenue', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Date Checked']]
                 display_limit = min(top_n, 20)
                 
-                for idx, row in top_sales.head(display_limit).iterrows():
-                    time_ago = (datetime.now() - row['Date Checked']).total_seconds() / 60 if pd.notna(row['Date Checked']) else None
-                    badge = f'<span class="recent-badge">NEW</span> ' if time_ago and time_ago < 60 else ''
-                    st.markdown(f"""<div class="product-highlight">{badge}<strong>{row['Product'].title()}</strong><br>
-                        <small>ID: {row['Item ID']} | Price: ${row['Price']:.2f}</small><br>
-                        Total: <strong>{row['Total Sales']}</strong> sales | Revenue: <strong>${row['Total Revenue']:,.2f}</strong><br>
-                        Dec: {row['Dec 2025 Sales']} | Jan: {row['Jan 2026 Sales']}</div>""", unsafe_allow_html=True)
+                card_rows = top_sales.head(display_limit)
+                ages_min = (np.datetime64(datetime.now()) - card_rows['Date Checked'].to_numpy('datetime64[s]')) / np.timedelta64(1, 'm')
+                badges = np.where(~np.isnan(ages_min) & (ages_min < 60), '<span class="recent-badge">NEW</span> ', '')
+                html_parts = []
+                for badge, (product, item_id, total_sales, price, total_revenue, dec_sales, jan_sales, _) in zip(badges, card_rows.itertuples(index=False, name=None)):
+                    html_parts.append(f"""<div class="product-highlight">{badge}<strong>{title_map[product]}</strong><br>
+                        <small>ID: {item_id} | Price: ${price:.2f}</small><br>
+                        Total: <strong>{total_sales}</strong> sales | Revenue: <strong>${total_revenue:,.2f}</strong><br>
+                        Dec: {dec_sales} | Jan: {jan_sales}</div>""")
+                st.markdown(''.join(html_parts), unsafe_allow_html=True)
                 
                 if top_n > display_limit:
                     with st.expander(f"View remaining {top_n - display_limit} items"):
@@ -222,14 +333,17 @@ if uploaded_file is not None:
             
             with col2:
                 st.markdown(f"### 📈 Top {top_n} Growth (Absolute)")
-                top_growth = filtered_df.nlargest(top_n, 'Growth')[['Product', 'Item ID', 'Growth', 'Growth %', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Date Checked']]
+                top_growth = top_n_rows(filtered_df, 'Growth', top_n)[['Product', 'Item ID', 'Growth', 'Growth %', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Date Checked']]
                 
-                for idx, row in top_growth.head(display_limit).iterrows():
-                    time_ago = (datetime.now() - row['Date Checked']).total_seconds() / 60 if pd.notna(row['Date Checked']) else None
-                    badge = f'<span class="recent-badge">NEW</span> ' if time_ago and time_ago < 60 else ''
-                    st.markdown(f"""<div class="product-highlight">{badge}<strong>{row['Product'].title()}</strong><br>
-                        <small>ID: {row['Item ID']}</small><br>
-                        Growth: <strong>+{row['Growth']}</strong> ({row['Growth %']:+.0f}%) | {row['Dec 2025 Sales']} → {row['Jan 2026 Sales']}</div>""", unsafe_allow_html=True)
+                card_rows = top_growth.head(display_limit)
+                ages_min = (np.datetime64(datetime.now()) - card_rows['Date Checked'].to_numpy('datetime64[s]')) / np.timedelta64(1, 'm')
+                badges = np.where(~np.isnan(ages_min) & (ages_min < 60), '<span class="recent-badge">NEW</span> ', '')
+                html_parts = []
+                for badge, (product, item_id, growth, growth_pct, dec_sales, jan_sales, _) in zip(badges, card_rows.itertuples(index=False, name=None)):
+                    html_parts.append(f"""<div class="product-highlight">{badge}<strong>{title_map[product]}</strong><br>
+                        <small>ID: {item_id}</small><br>
+                        Growth: <strong>+{growth}</strong> ({growth_pct:+.0f}%) | {dec_sales} → {jan_sales}</div>""")
+                st.markdown(''.join(html_parts), unsafe_allow_html=True)
                 
                 if top_n > display_limit:
                     with st.expander(f"View remaining {top_n - display_limit} items"):
@@ -239,7 +353,7 @@ if uploaded_file is not None:
             if top_n > 20:
                 st.info(f"📊 Chart showing top {chart_limit} for readability. Full list of {top_n} shown above.")
             
-            top_n_sales = filtered_df.nlargest(chart_limit, 'Total Sales')
+            top_n_sales = filtered_df.head(chart_limit)
             fig = go.Figure()
             fig.add_trace(go.Bar(name='Dec 2025', x=top_n_sales['Product'], y=top_n_sales['Dec 2025 Sales'], marker_color='#667eea'))
             fig.add_trace(go.Bar(name='Jan 2026', x=top_n_sales['Product'], y=top_n_sales['Jan 2026 Sales'], marker_color='#764ba2'))
@@ -251,13 +365,11 @@ if uploaded_file is not None:
             category_stats = calculate_category_stats(filtered_df)
             st.dataframe(category_stats, use_container_width=True, hide_index=True, height=400)
             
+            fig_pie, fig_bar = build_category_charts(category_stats)
             col1, col2 = st.columns(2)
             with col1:
-                fig_pie = px.pie(category_stats.head(10), values='Total Sales', names='Product', title='Sales Distribution (Top 10 Categories)')
                 st.plotly_chart(fig_pie, use_container_width=True)
             with col2:
-                fig_bar = px.bar(category_stats.head(15), x='Product', y='Listings Count', title='Number of Listings per Category (Top 15)', color='Total Sales', color_continuous_scale='Viridis')
-                fig_bar.update_layout(xaxis_tickangle=-45)
                 st.plotly_chart(fig_bar, use_container_width=True)
         
         with tab3:
@@ -265,16 +377,25 @@ if uploaded_file is not None:
             col1, col2 = st.columns(2)
             
             with col1:
-                growth_bins = pd.cut(filtered_df['Growth %'], bins=[-float('inf'), -50, -10, 0, 10, 50, float('inf')],
-                                    labels=['Decline >50%', 'Decline 10-50%', 'Decline <10%', 'Growth <10%', 'Growth 10-50%', 'Growth >50%'])
-                growth_dist = growth_bins.value_counts().sort_index()
-                fig_growth = px.bar(x=growth_dist.index, y=growth_dist.values, title='Growth Distribution',
-                                   labels={'x': 'Growth Category', 'y': 'Number of Products'}, color=growth_dist.values, color_continuous_scale='RdYlGn')
+                growth_labels = ['Decline >50%', 'Decline 10-50%', 'Decline <10%', 'Growth <10%', 'Growth 10-50%', 'Growth >50%']
+                growth_counts = calculate_growth_distribution(filtered_df)
+                fig_growth = px.bar(x=growth_labels, y=growth_counts, title='Growth Distribution',
+                                   labels={'x': 'Growth Category', 'y': 'Number of Products'}, color=growth_counts, color_continuous_scale='RdYlGn')
                 st.plotly_chart(fig_growth, use_container_width=True)
             
             with col2:
                 scatter_sample = filtered_df.sample(n=min(3000, len(filtered_df)), random_state=42) if len(filtered_df) > 3000 else filtered_df
-                fig_scatter = px.scatter(scatter_sample, x='Dec 2025 Sales', y='Jan 2026 Sales', color='Product', size='Total Sales', hover_data=['Item ID'], title='Dec vs Jan Sales Correlation')
+                if filtered_df['Product'].nunique() <= 20:
+                    color_arg = 'Product'
+                else:
+                    # Keep the legend readable on wide catalogs: color the top
+                    # 10 products by sales and fold the tail into 'Other'.
+                    top_products = filtered_df.groupby('Product', observed=True)['Total Sales'].sum().nlargest(10).index
+                    scatter_sample = scatter_sample.assign(**{
+                        'Product Group': np.where(scatter_sample['Product'].isin(top_products),
+                                                  scatter_sample['Product'].astype(str), 'Other')})
+                    color_arg = 'Product Group'
+                fig_scatter = px.scatter(scatter_sample, x='Dec 2025 Sales', y='Jan 2026 Sales', color=color_arg, size='Total Sales', hover_data=['Item ID', 'Product'], title='Dec vs Jan Sales Correlation', render_mode='webgl')
                 fig_scatter.add_trace(go.Scatter(x=[0, scatter_sample['Dec 2025 Sales'].max()], y=[0, scatter_sample['Dec 2025 Sales'].max()],
                                                 mode='lines', name='Equal Performance', line=dict(dash='dash', color='gray')))
                 st.plotly_chart(fig_scatter, use_container_width=True)
@@ -284,12 +405,12 @@ if uploaded_file is not None:
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("#### 🌟 Biggest Winners")
-                winners = filtered_df.nlargest(5, 'Growth')[['Product', 'Item ID', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Growth', 'Growth %']]
-                st.dataframe(winners, hide_index=True, use_container_width=True)
+                winners = top_n_rows(filtered_df, 'Growth', 5)
+                st.dataframe(winners, hide_index=True, use_container_width=True, column_order=['Product', 'Item ID', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Growth', 'Growth %'])
             with col2:
                 st.markdown("#### ⚠️ Biggest Declines")
-                losers = filtered_df.nsmallest(5, 'Growth')[['Product', 'Item ID', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Growth', 'Growth %']]
-                st.dataframe(losers, hide_index=True, use_container_width=True)
+                losers = top_n_rows(filtered_df, 'Growth', 5, ascending=True)
+                st.dataframe(losers, hide_index=True, use_container_width=True, column_order=['Product', 'Item ID', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Growth', 'Growth %'])
         
         with tab4:
             st.markdown("### 💰 Revenue & Pricing Analysis")
@@ -297,50 +418,64 @@ if uploaded_file is not None:
             
             with col1:
                 st.markdown("#### 💎 Top 10 Revenue Generators")
-                top_revenue = filtered_df.nlargest(10, 'Total Revenue')[['Product', 'Item ID', 'Price', 'Total Sales', 'Total Revenue']]
-                st.dataframe(top_revenue, hide_index=True, use_container_width=True)
+                top_revenue = top_n_rows(filtered_df, 'Total Revenue', 10)
+                st.dataframe(top_revenue, hide_index=True, use_container_width=True, column_order=['Product', 'Item ID', 'Price', 'Total Sales', 'Total Revenue'])
                 
                 st.markdown("#### 💵 Revenue by Price Range")
-                price_bins = pd.cut(filtered_df['Price'], bins=[0, 10, 25, 50, 100, float('inf')], labels=['$0-10', '$10-25', '$25-50', '$50-100', '$100+'])
-                revenue_by_price = filtered_df.groupby(price_bins, observed=True)['Total Revenue'].sum().reset_index()
-                revenue_by_price.columns = ['Price Range', 'Revenue']
+                price_bin_idx = np.digitize(filtered_df['Price'].to_numpy(), [10, 25, 50, 100], right=True)
+                revenue_by_price = pd.DataFrame({'Price Range': ['$0-10', '$10-25', '$25-50', '$50-100', '$100+'],
+                                                 'Revenue': np.bincount(price_bin_idx, weights=filtered_df['Total Revenue'].to_numpy(), minlength=5)})
                 fig_price_revenue = px.bar(revenue_by_price, x='Price Range', y='Revenue', title='Total Revenue by Price Range', color='Revenue', color_continuous_scale='Greens')
                 st.plotly_chart(fig_price_revenue, use_container_width=True)
             
             with col2:
                 st.markdown("#### 📊 Price vs Sales Relationship")
                 scatter_sample = filtered_df.sample(n=min(2000, len(filtered_df)), random_state=42) if len(filtered_df) > 2000 else filtered_df
-                fig_price_scatter = px.scatter(scatter_sample, x='Price', y='Total Sales', color='Product', size='Total Revenue', hover_data=['Item ID', 'Total Revenue'], title='Price Impact on Sales Volume')
+                if filtered_df['Product'].nunique() <= 20:
+                    price_color = 'Product'
+                else:
+                    # Same trace cap as the correlation scatter: top 10 by
+                    # sales keep their color, the long tail folds into Other.
+                    top_products = filtered_df.groupby('Product', observed=True)['Total Sales'].sum().nlargest(10).index
+                    scatter_sample = scatter_sample.assign(**{
+                        'Product Group': np.where(scatter_sample['Product'].isin(top_products),
+                                                  scatter_sample['Product'].astype(str), 'Other')})
+                    price_color = 'Product Group'
+                fig_price_scatter = px.scatter(scatter_sample, x='Price', y='Total Sales', color=price_color, size='Total Revenue', hover_data=['Item ID', 'Total Revenue'], title='Price Impact on Sales Volume', render_mode='webgl')
                 st.plotly_chart(fig_price_scatter, use_container_width=True)
                 if len(filtered_df) > 2000:
                     st.caption(f"📊 Showing random sample of 2,000 products from {len(filtered_df):,} total")
                 
                 st.markdown("#### 📈 Top 10 Revenue Growth")
-                top_rev_growth = filtered_df.nlargest(10, 'Revenue Growth')[['Product', 'Item ID', 'Price', 'Dec Revenue', 'Jan Revenue', 'Revenue Growth']]
-                st.dataframe(top_rev_growth, hide_index=True, use_container_width=True)
+                top_rev_growth = top_n_rows(filtered_df, 'Revenue Growth', 10)
+                st.dataframe(top_rev_growth, hide_index=True, use_container_width=True, column_order=['Product', 'Item ID', 'Price', 'Dec Revenue', 'Jan Revenue', 'Revenue Growth'])
             
             st.markdown("---")
             st.markdown("#### 💡 Revenue Insights")
             col1, col2, col3 = st.columns(3)
             
-            high_price = filtered_df[filtered_df['Price'] > 50]
-            mid_price = filtered_df[(filtered_df['Price'] >= 25) & (filtered_df['Price'] <= 50)]
-            low_price = filtered_df[filtered_df['Price'] < 25]
-            
+            price_arr = filtered_df['Price'].to_numpy()
+            sales_arr = filtered_df['Total Sales'].to_numpy()
+            revenue_arr = filtered_df['Total Revenue'].to_numpy()
+            high_mask = price_arr > 50
+            mid_mask = (price_arr >= 25) & ~high_mask
+            low_mask = price_arr < 25
+
             with col1:
-                st.metric("Premium Products ($50+)", f"{high_price['Total Sales'].sum():,} sales", f"${high_price['Total Revenue'].sum():,.2f} revenue")
+                st.metric("Premium Products ($50+)", f"{sales_arr[high_mask].sum():,} sales", f"${revenue_arr[high_mask].sum():,.2f} revenue")
             with col2:
-                st.metric("Mid-Range ($25-50)", f"{mid_price['Total Sales'].sum():,} sales", f"${mid_price['Total Revenue'].sum():,.2f} revenue")
+                st.metric("Mid-Range ($25-50)", f"{sales_arr[mid_mask].sum():,} sales", f"${revenue_arr[mid_mask].sum():,.2f} revenue")
             with col3:
-                st.metric("Budget (<$25)", f"{low_price['Total Sales'].sum():,} sales", f"${low_price['Total Revenue'].sum():,.2f} revenue")
+                st.metric("Budget (<$25)", f"{sales_arr[low_mask].sum():,} sales", f"${revenue_arr[low_mask].sum():,.2f} revenue")
         
         with tab5:
             st.markdown("### 📋 Complete Product Listing")
             search_term = st.text_input("🔍 Search products or Item ID", "")
             
-            display_df = filtered_df.copy()
+            display_df = filtered_df
             if search_term:
-                display_df = display_df[display_df['Product'].str.contains(search_term, case=False, na=False) | display_df['Item ID'].str.contains(search_term, case=False, na=False)]
+                term = search_term.lower()
+                display_df = display_df[display_df['Product'].str.lower().str.contains(term, regex=False, na=False) | display_df['Item ID'].str.lower().str.contains(term, regex=False, na=False)]
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -351,12 +486,19 @@ if uploaded_file is not None:
                 show_url = st.checkbox("Show URLs", value=False)
             
             ascending = (sort_order == 'Ascending')
-            display_df = display_df.sort_values(sort_by, ascending=ascending)
-            
+            if sort_by != 'Total Sales' or ascending:
+                display_df = display_df.sort_values(sort_by, ascending=ascending)
+
             columns = ['Product', 'Item ID', 'Price', 'Dec 2025 Sales', 'Jan 2026 Sales', 'Total Sales', 'Growth', 'Growth %', 'Total Revenue', 'Date Checked']
             if show_url:
                 columns.append('URL')
-            
+
+            # Cap what gets Arrow-serialized to the browser; the full set is
+            # still available via the export buttons below.
+            table_rows = len(display_df)
+            if table_rows > 1000:
+                display_df = display_df.head(1000)
+
             st.dataframe(display_df[columns], use_container_width=True, hide_index=True, height=600,
                         column_config={"URL": st.column_config.LinkColumn("eBay Link"),
                                       "Price": st.column_config.NumberColumn("Price", format="$%.2f"),
@@ -364,11 +506,11 @@ if uploaded_file is not None:
                                       "Total Revenue": st.column_config.NumberColumn("Total Revenue", format="$%.2f"),
                                       "Date Checked": st.column_config.DatetimeColumn("Date Added", format="MMM D, h:mm a")})
             
-            st.info(f"Showing {len(display_df):,} of {len(filtered_df):,} products")
+            st.info(f"Showing {len(display_df):,} of {table_rows:,} matching ({len(filtered_df):,} filtered) products")
         
         with tab6:
             st.markdown("### 🎯 Individual Product Analysis")
-            selected_product_deep = st.selectbox("Select a product to analyze", sorted(df['Product'].unique()))
+            selected_product_deep = st.selectbox("Select a product to analyze", df_meta['products'][1:])
             product_data = df[df['Product'] == selected_product_deep]
             
             col1, col2, col3, col4, col5 = st.columns(5)
@@ -421,10 +563,10 @@ if uploaded_file is not None:
         
         col1, col2 = st.columns(2)
         with col1:
-            csv = filtered_df.to_csv(index=False).encode('utf-8')
+            csv = dataframe_to_csv_bytes(filtered_df)
             st.download_button("⬇️ Download Filtered Data (CSV)", data=csv, file_name=f"sales_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", mime="text/csv")
         with col2:
-            summary_csv = category_stats.to_csv(index=False).encode('utf-8')
+            summary_csv = dataframe_to_csv_bytes(category_stats)
             st.download_button("⬇️ Download Category Summary (CSV)", data=summary_csv, file_name=f"category_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", mime="text/csv")
 
 else: